@@ -1,8 +1,10 @@
 import random
+import sys
 
 import pytest
 
-from vllm.core.block.common import RefCounter
+from vllm.core.block.common import RefCounter, get_all_blocks_recursively
+from vllm.core.block.naive_block import NaiveBlock
 
 
 @pytest.mark.parametrize("seed", list(range(20)))
@@ -40,3 +42,35 @@ def test_incr_decr(seed: int, num_incrs: int, num_blocks: int):
 
     with pytest.raises(AssertionError):
         counter.decr(block_id)
+
+
+@pytest.mark.parametrize("num_blocks", [1, 1024])
+@pytest.mark.parametrize("first_block_id", [0, 512])
+def test_block_id_range(num_blocks: int, first_block_id: int):
+    all_block_indices = list(
+        range(first_block_id, first_block_id + num_blocks))
+    counter = RefCounter(all_block_indices=all_block_indices)
+
+    for block_id in all_block_indices:
+        assert counter.get(block_id) == 0
+        assert counter.incr(block_id) == 1
+
+    for block_id in (first_block_id - 1, first_block_id + num_blocks):
+        with pytest.raises(AssertionError):
+            counter.incr(block_id)
+
+
+@pytest.mark.parametrize("num_blocks", [1, 10, sys.getrecursionlimit() + 1])
+def test_get_all_blocks_recursively(num_blocks: int):
+    blocks = []
+    prev_block = None
+    for _ in range(num_blocks):
+        prev_block = NaiveBlock(prev_block=prev_block,
+                                token_ids=[],
+                                block_size=16,
+                                allocator=None)
+        blocks.append(prev_block)
+
+    all_blocks = get_all_blocks_recursively(blocks[-1])
+    assert len(all_blocks) == num_blocks
+    assert all(a is b for a, b in zip(all_blocks, blocks))
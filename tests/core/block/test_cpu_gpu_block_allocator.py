@@ -1,6 +1,7 @@
 import pytest
 
 from vllm.core.block.cpu_gpu_block_allocator import CpuGpuBlockAllocator
+from vllm.core.block.interfaces import BlockAllocator
 from vllm.utils import Device, chunk_list
 
 
@@ -43,6 +44,68 @@ def test_allocate_mutable(num_cpu_blocks: int, num_gpu_blocks: int,
     assert allocator.get_num_free_blocks(Device.GPU) == num_gpu_blocks
 
 
+@pytest.mark.parametrize("num_cpu_blocks", [0, 512])
+@pytest.mark.parametrize("num_gpu_blocks", [1024])
+@pytest.mark.parametrize("block_size", [16])
+@pytest.mark.parametrize("allocator_type", ["naive", "prefix_caching"])
+def test_allocate_mutable_batch(num_cpu_blocks: int, num_gpu_blocks: int,
+                                block_size: int, allocator_type: str):
+    allocator = CpuGpuBlockAllocator.create(
+        allocator_type=allocator_type,
+        num_gpu_blocks=num_gpu_blocks,
+        num_cpu_blocks=num_cpu_blocks,
+        block_size=block_size,
+    )
+
+    cpu_blocks = allocator.allocate_mutable_batch(prev_block=None,
+                                                  count=num_cpu_blocks,
+                                                  device=Device.CPU)
+    assert len(cpu_blocks) == num_cpu_blocks
+    assert allocator.get_num_free_blocks(Device.CPU) == 0
+    assert allocator.get_num_free_blocks(Device.GPU) == num_gpu_blocks
+
+    gpu_blocks = allocator.allocate_mutable_batch(prev_block=None,
+                                                  count=num_gpu_blocks,
+                                                  device=Device.GPU)
+    assert len(gpu_blocks) == num_gpu_blocks
+    assert allocator.get_num_free_blocks(Device.GPU) == 0
+
+    # Each block is linked to the one allocated before it.
+    assert gpu_blocks[0].prev_block is None
+    assert all(block.prev_block is prev_block
+               for prev_block, block in zip(gpu_blocks, gpu_blocks[1:]))
+
+    allocator.free_many(cpu_blocks + gpu_blocks)
+    assert allocator.get_num_free_blocks(Device.CPU) == num_cpu_blocks
+    assert allocator.get_num_free_blocks(Device.GPU) == num_gpu_blocks
+
+
+@pytest.mark.parametrize("num_gpu_blocks", [4, 1024])
+@pytest.mark.parametrize("block_size", [16])
+@pytest.mark.parametrize("allocator_type", ["naive", "prefix_caching"])
+def test_allocate_mutable_batch_no_free_blocks(num_gpu_blocks: int,
+                                               block_size: int,
+                                               allocator_type: str):
+    allocator = CpuGpuBlockAllocator.create(
+        allocator_type=allocator_type,
+        num_gpu_blocks=num_gpu_blocks,
+        num_cpu_blocks=0,
+        block_size=block_size,
+    )
+
+    block = allocator.allocate_mutable(prev_block=None, device=Device.GPU)
+
+    # A batch that runs out of blocks partway frees what it had allocated.
+    with pytest.raises(BlockAllocator.NoFreeBlocksError):
+        allocator.allocate_mutable_batch(prev_block=block,
+                                         count=num_gpu_blocks,
+                                         device=Device.GPU)
+    assert allocator.get_num_free_blocks(Device.GPU) == num_gpu_blocks - 1
+
+    allocator.free(block)
+    assert allocator.get_num_free_blocks(Device.GPU) == num_gpu_blocks
+
+
 @pytest.mark.parametrize("num_cpu_blocks", [0, 512])
 @pytest.mark.parametrize("num_gpu_blocks", [1024])
 @pytest.mark.parametrize("block_size", [2])
@@ -4,6 +4,7 @@ import pytest
 
 from vllm.core.block.interfaces import Block, BlockAllocator
 from vllm.core.block.naive_block import NaiveBlock, NaiveBlockAllocator
+from vllm.utils import chunk_list
 
 
 class TestNaiveBlockAllocator:
@@ -100,3 +101,34 @@ class TestNaiveBlockAllocator:
         for i, block in enumerate(blocks):
             assert allocator.get_num_free_blocks() == i
             allocator.free(block)
+
+    @staticmethod
+    @pytest.mark.parametrize("num_blocks", [1, 1024])
+    @pytest.mark.parametrize("block_size", [1, 16])
+    def test_allocate_immutable_batch(num_blocks: int, block_size: int):
+        allocator = NaiveBlockAllocator(create_block=NaiveBlock,
+                                        num_blocks=num_blocks,
+                                        block_size=block_size)
+        block_token_ids = chunk_list(list(range(num_blocks * block_size)),
+                                     block_size)
+
+        # Allocating more blocks than are free allocates nothing.
+        with pytest.raises(BlockAllocator.NoFreeBlocksError):
+            allocator.allocate_immutable_batch(
+                prev_block=None,
+                block_token_ids=block_token_ids + [block_token_ids[0]])
+        assert allocator.get_num_free_blocks() == num_blocks
+
+        blocks = allocator.allocate_immutable_batch(
+            prev_block=None, block_token_ids=block_token_ids)
+        assert allocator.get_num_free_blocks() == 0
+        assert [block.token_ids for block in blocks] == block_token_ids
+        # The lowest block ids are handed out first, in chain order.
+        assert [block.block_id for block in blocks] == list(range(num_blocks))
+        assert blocks[0].prev_block is None
+        assert all(block.prev_block is prev_block
+                   for prev_block, block in zip(blocks, blocks[1:]))
+
+        for block in blocks:
+            allocator.free(block)
+        assert allocator.get_num_free_blocks() == num_blocks
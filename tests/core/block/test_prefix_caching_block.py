@@ -1,4 +1,3 @@
-import math
 import random
 from typing import List, Optional
 from unittest.mock import MagicMock
@@ -8,6 +7,7 @@ import pytest
 from vllm.core.block.interfaces import Block, BlockAllocator
 from vllm.core.block.prefix_caching_block import (PrefixCachingBlock,
                                                   PrefixCachingBlockAllocator)
+from vllm.utils import cdiv, chunk_list
 
 
 class TestPrefixCachingBlock:
@@ -124,8 +124,8 @@ class TestPrefixCachingBlock:
         """Helper method which creates a chain of blocks.
         """
         blocks = []
-        num_blocks = math.ceil(
-            len(token_ids) / block_size) + num_empty_trailing_blocks
+        num_blocks = cdiv(len(token_ids),
+                          block_size) + num_empty_trailing_blocks
 
         if num_blocks == 0:
             return []
@@ -367,16 +367,8 @@ class TestPrefixCachingBlockAllocator:
         """Helper method which creates a chain of blocks.
         """
         blocks = []
-        num_blocks = math.ceil(len(token_ids) / block_size)
-
-        if num_blocks == 0:
-            return []
-
         prev_block = None
-        for block_number in range(0, num_blocks):
-            block_token_ids = token_ids[block_number *
-                                        block_size:(block_number + 1) *
-                                        block_size]
+        for block_token_ids in chunk_list(token_ids, block_size):
             prev_block = allocator.allocate_immutable(
                 prev_block=prev_block, token_ids=block_token_ids)
             blocks.append(prev_block)
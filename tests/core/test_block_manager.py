@@ -215,7 +215,7 @@ def test_swap():
     before_cpu_blocks = block_manager.get_num_free_cpu_blocks()
     before_gpu_blocks = block_manager.get_num_free_gpu_blocks()
     mapping = block_manager.swap_out(seq_group)
-    assert list(mapping.keys()) == gpu_blocks
+    assert mapping.keys() == set(gpu_blocks)
     after_cpu_blocks = block_manager.get_num_free_cpu_blocks()
     after_gpu_blocks = block_manager.get_num_free_gpu_blocks()
     assert before_cpu_blocks == after_cpu_blocks + len(gpu_blocks)
@@ -228,7 +228,7 @@ def test_swap():
     before_cpu_blocks = block_manager.get_num_free_cpu_blocks()
     before_gpu_blocks = block_manager.get_num_free_gpu_blocks()
     mapping = block_manager.swap_in(seq_group)
-    assert list(mapping.keys()) == cpu_blocks
+    assert mapping.keys() == set(cpu_blocks)
     after_cpu_blocks = block_manager.get_num_free_cpu_blocks()
     after_gpu_blocks = block_manager.get_num_free_gpu_blocks()
     assert before_cpu_blocks + len(cpu_blocks) == after_cpu_blocks
@@ -280,6 +280,58 @@ def test_reset():
     assert block_manager.get_num_free_gpu_blocks() == original_blocks
 
 
+def test_get_common_computed_block_ids():
+    block_size = 4
+    num_cpu_blocks = 4
+    num_gpu_blocks = 8
+    block_manager = BlockSpaceManagerV1(block_size,
+                                        num_cpu_blocks,
+                                        num_gpu_blocks,
+                                        watermark=0,
+                                        enable_caching=True)
+
+    prompt, seq_group = create_dummy_prompt("1", 3 * block_size, block_size)
+    block_manager.allocate(seq_group)
+
+    # Nothing has been computed yet.
+    assert block_manager.get_common_computed_block_ids([prompt]) == []
+
+    # The last block is never reported as computed.
+    block_manager.mark_blocks_as_computed(seq_group)
+    block_table = block_manager.get_block_table(prompt)
+    assert block_manager.get_common_computed_block_ids(
+        [prompt]) == block_table[:-1]
+
+
+def test_free_stamps_last_accessed():
+    block_size = 4
+    num_cpu_blocks = 4
+    num_gpu_blocks = 8
+    block_manager = BlockSpaceManagerV1(block_size,
+                                        num_cpu_blocks,
+                                        num_gpu_blocks,
+                                        watermark=0,
+                                        enable_caching=True)
+
+    prompt, seq_group = create_dummy_prompt("1", 3 * block_size, block_size)
+    block_manager.allocate(seq_group)
+    block_table = block_manager.get_block_table(prompt)
+
+    access_time = 42.0
+    block_manager.access_all_blocks_in_seq(prompt, access_time)
+    block_manager.free(prompt)
+
+    # The freed blocks become eviction candidates stamped with the time of
+    # their last access.
+    evictor = block_manager.gpu_allocator.evictor
+    assert evictor.num_blocks == len(block_table)
+    evicted_blocks = [evictor.evict() for _ in range(len(block_table))]
+    assert sorted(block.block_number
+                  for block in evicted_blocks) == sorted(block_table)
+    assert all(block.last_accessed == access_time
+               for block in evicted_blocks)
+
+
 def test_sliding_window_multi_seq():
     """
     Tests that memory allocation and deallocation is handled
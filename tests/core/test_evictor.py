@@ -0,0 +1,61 @@
+import pytest
+
+from vllm.block import PhysicalTokenBlock
+from vllm.core.evictor import EvictionPolicy, make_evictor
+from vllm.utils import Device
+
+
+def _make_block(block_hash: int, last_accessed: float,
+                num_hashed_tokens: int) -> PhysicalTokenBlock:
+    block = PhysicalTokenBlock(device=Device.GPU,
+                               block_number=block_hash,
+                               block_size=16,
+                               block_hash=block_hash,
+                               num_hashed_tokens=num_hashed_tokens)
+    block.last_accessed = last_accessed
+    return block
+
+
+def test_lru_evictor_order():
+    evictor = make_evictor(EvictionPolicy.LRU)
+    blocks = [
+        _make_block(0, last_accessed=2.0, num_hashed_tokens=16),
+        _make_block(1, last_accessed=1.0, num_hashed_tokens=16),
+        _make_block(2, last_accessed=1.0, num_hashed_tokens=32),
+        _make_block(3, last_accessed=3.0, num_hashed_tokens=48),
+    ]
+    for block in blocks:
+        evictor.add(block)
+    assert evictor.num_blocks == len(blocks)
+
+    # Oldest first; ties go to the block with the most hashed tokens.
+    evicted = [evictor.evict().block_hash for _ in range(len(blocks))]
+    assert evicted == [2, 1, 0, 3]
+    assert evictor.num_blocks == 0
+
+    with pytest.raises(ValueError):
+        evictor.evict()
+
+
+def test_lru_evictor_remove_and_readd():
+    evictor = make_evictor(EvictionPolicy.LRU)
+    blocks = [
+        _make_block(i, last_accessed=float(i), num_hashed_tokens=16)
+        for i in range(10)
+    ]
+    for block in blocks:
+        evictor.add(block)
+
+    # Bring back the oldest blocks, then free one of them again later.
+    for block in blocks[:5]:
+        assert evictor.remove(block.block_hash) is block
+        assert block.block_hash not in evictor
+    blocks[0].last_accessed = 100.0
+    evictor.add(blocks[0])
+
+    with pytest.raises(ValueError):
+        evictor.remove(blocks[1].block_hash)
+
+    evicted = [evictor.evict().block_hash for _ in range(6)]
+    assert evicted == [5, 6, 7, 8, 9, 0]
+    assert evictor.num_blocks == 0
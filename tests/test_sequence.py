@@ -5,8 +5,9 @@ import pytest
 
 from vllm import SamplingParams
 from vllm.lora.request import LoRARequest
-from vllm.sequence import (SamplerOutput, Sequence, SequenceData,
-                           SequenceGroup, SequenceGroupOutput, SequenceOutput)
+from vllm.sequence import (Logprob, SamplerOutput, Sequence, SequenceData,
+                           SequenceGroup, SequenceGroupOutput, SequenceOutput,
+                           SequenceStatus)
 
 
 def create_dummy_prompt(
@@ -122,3 +123,42 @@ def test_sequence_group_stage():
     assert seq_group.is_prefill() is True
     seq_group.update_num_computed_tokens(1)
     assert seq_group.is_prefill() is False
+
+
+@pytest.mark.parametrize("status, reason", [
+    (SequenceStatus.WAITING, None),
+    (SequenceStatus.RUNNING, None),
+    (SequenceStatus.SWAPPED, None),
+    (SequenceStatus.FINISHED_STOPPED, "stop"),
+    (SequenceStatus.FINISHED_LENGTH_CAPPED, "length"),
+    (SequenceStatus.FINISHED_ABORTED, "abort"),
+    (SequenceStatus.FINISHED_IGNORED, "length"),
+])
+def test_sequence_status_finished_reason(status, reason):
+    assert SequenceStatus.get_finished_reason(status) == reason
+
+
+def test_sequence_hash_of_block():
+    block_size = 4
+    prompt_tokens = list(range(6))
+    seq = Sequence(1, "", prompt_tokens, block_size)
+
+    full_block_hash = seq.hash_of_block(0)
+    assert full_block_hash == hash((tuple(prompt_tokens[:4]), 0))
+
+    # The hash of a partial block tracks the tokens appended to it.
+    partial_block_hash = seq.hash_of_block(1)
+    seq.append_token_id(6, {6: Logprob(0.0)})
+    seq.append_token_id(7, {7: Logprob(0.0)})
+    assert seq.hash_of_block(1) == hash((tuple(range(8)), 0))
+    assert seq.hash_of_block(1) != partial_block_hash
+
+    assert seq.hash_of_block(0) == full_block_hash
+
+
+def test_sequence_data_get_token_ids_from():
+    seq_data = SequenceData(prompt_token_ids=[1, 2, 3],
+                            output_token_ids=[4, 5])
+    token_ids = seq_data.get_token_ids()
+    for start in range(len(token_ids) + 1):
+        assert seq_data.get_token_ids_from(start) == token_ids[start:]
@@ -52,6 +52,9 @@ class LogicalTokenBlock:
 class PhysicalTokenBlock:
     """Represents the state of a block in the KV cache."""
 
+    __slots__ = ("device", "block_number", "block_size", "block_hash",
+                 "num_hashed_tokens", "ref_count", "last_accessed", "computed")
+
     def __init__(
         self,
         device: Device,
@@ -47,23 +47,23 @@ class BlockTable:
         self._num_full_slots = len(self._get_all_token_ids())
 
     @staticmethod
-    def get_num_required_blocks(token_ids: List[int], block_size: int) -> int:
+    def get_num_required_blocks(num_tokens: int, block_size: int) -> int:
         """Calculates the minimum number of blocks required to store a given
-        sequence of token IDs.
+        number of tokens.
 
         This assumes worst-case scenario, where every block requires a new
         allocation (e.g. ignoring prefix caching).
 
         Args:
-            token_ids (List[int]): The sequence of token IDs to be stored.
+            num_tokens (int): The number of tokens to be stored.
             block_size (int): The maximum number of tokens that can be stored in
                 a single block.
 
         Returns:
             int: The minimum number of blocks required to store the given
-                sequence of token IDs.
+                number of tokens.
         """
-        return cdiv(len(token_ids), block_size)
+        return cdiv(num_tokens, block_size)
 
     def allocate(self,
                  token_ids: List[int],
@@ -139,10 +139,11 @@ class BlockTable:
         slots_to_allocate = num_empty_slots - self._num_empty_slots
         blocks_to_allocate = cdiv(slots_to_allocate, self._block_size)
 
-        for _ in range(blocks_to_allocate):
-            self._blocks.append(
-                self._allocator.allocate_mutable(prev_block=self._blocks[-1],
-                                                 device=device))
+        self._blocks.extend(
+            self._allocator.allocate_mutable_batch(
+                prev_block=self._blocks[-1],
+                count=blocks_to_allocate,
+                device=device))
 
     def fork(self) -> "BlockTable":
         """Creates a new BlockTable instance with a copy of the blocks from the
@@ -168,14 +169,13 @@ class BlockTable:
     def free(self) -> None:
         """Frees the memory occupied by the blocks in the BlockTable.
 
-        This method iterates over all the blocks in the `_blocks` list and calls
-        the `free` method of the `_allocator` object to release the memory
+        This method passes all the blocks in the `_blocks` list to the
+        `free_many` method of the `_allocator` object to release the memory
         occupied by each block. After freeing all the blocks, the `_blocks` list
         is set to `None`.
         """
         assert self._is_allocated
-        for block in self._blocks:
-            self._allocator.free(block)
+        self._allocator.free_many(self._blocks)
         self._blocks = None
 
     @property
@@ -195,40 +195,25 @@ class BlockTable:
         assert self._is_allocated
         return [block.block_id for block in self._blocks]
 
-    def get_unseen_token_ids(self, sequence_token_ids: List[int]) -> List[int]:
-        """Get the number of "unseen" tokens in the sequence.
-
-        Unseen tokens are tokens in the sequence corresponding to this block
-        table, but are not yet appended to this block table.
-
-        Args:
-            sequence_token_ids (List[int]): The list of token ids in the
-                sequence.
-
-        Returns:
-            List[int]: The postfix of sequence_token_ids that has not yet been
-                appended to the block table.
-        """
-
-        # Since the block table is append-only, the unseen token ids are the
-        # ones after the appended ones.
-        return sequence_token_ids[self.num_full_slots:]
-
     def _allocate_blocks_for_token_ids(self, prev_block: Optional[Block],
                                        token_ids: List[int],
                                        device: Device) -> List[Block]:
-        blocks = []
-        for block_token_ids in chunk_list(token_ids, self._block_size):
-            if len(block_token_ids) == self._block_size:
-                # If the block is full, create an immutable block.
-                prev_block = self._allocator.allocate_immutable(
-                    prev_block, token_ids=block_token_ids, device=device)
-            else:
-                # Else, partially fill a mutable block with token ids.
-                prev_block = self._allocator.allocate_mutable(
-                    prev_block=prev_block, device=device)
-                prev_block.append_token_ids(block_token_ids)
-            blocks.append(prev_block)
+        block_token_ids = chunk_list(token_ids, self._block_size)
+        tail_token_ids = None
+        if len(block_token_ids[-1]) < self._block_size:
+            tail_token_ids = block_token_ids.pop()
+
+        # Full blocks are allocated as a chain of immutable blocks.
+        blocks = self._allocator.allocate_immutable_batch(
+            prev_block, block_token_ids=block_token_ids, device=device)
+
+        if tail_token_ids is not None:
+            # Partially fill a mutable block with the remaining token ids.
+            prev_block = blocks[-1] if blocks else prev_block
+            block = self._allocator.allocate_mutable(prev_block=prev_block,
+                                                     device=device)
+            block.append_token_ids(tail_token_ids)
+            blocks.append(block)
 
         return blocks
 
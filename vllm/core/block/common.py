@@ -1,5 +1,4 @@
-from collections import defaultdict
-from typing import Dict, Iterable, List, Optional
+from typing import Collection, Dict, List, Optional
 
 from vllm.core.block.interfaces import Block, BlockAllocator
 
@@ -10,45 +9,49 @@ RefCount = int
 class RefCounter:
     """A class for managing reference counts for a set of block indices.
 
-    The RefCounter class maintains a dictionary that maps block indices to their
-    corresponding reference counts. It provides methods to increment, decrement,
-    and retrieve the reference count for a given block index.
+    The RefCounter class maintains a list of reference counts indexed by block
+    index. Allocators hand out contiguous ranges of block indices, so the list
+    is offset by the smallest index it manages. It provides methods to
+    increment, decrement, and retrieve the reference count for a given block
+    index.
 
     Args:
-        all_block_indices (Iterable[BlockId]): An iterable of block indices
-            to initialize the reference counter with.
+        all_block_indices (Collection[BlockId]): The block indices to
+            initialize the reference counter with.
     """
 
-    def __init__(self, all_block_indices: Iterable[BlockId]):
-        deduped = set(all_block_indices)
-        self._refcounts: Dict[BlockId,
-                              RefCount] = {index: 0
-                                           for index in deduped}
+    __slots__ = ("_offset", "_refcounts")
 
-    def incr(self, block_id: BlockId) -> RefCount:
-        assert block_id in self._refcounts
-        pre_incr_refcount = self._refcounts[block_id]
-
-        assert pre_incr_refcount >= 0
+    def __init__(self, all_block_indices: Collection[BlockId]):
+        self._offset = min(all_block_indices, default=0)
+        num_slots = (max(all_block_indices) - self._offset +
+                     1 if all_block_indices else 0)
+        self._refcounts: List[RefCount] = [0] * num_slots
 
-        post_incr_refcount = pre_incr_refcount + 1
-        self._refcounts[block_id] = post_incr_refcount
+    def incr(self, block_id: BlockId) -> RefCount:
+        index = block_id - self._offset
+        assert 0 <= index < len(self._refcounts)
+        # Refcounts never go negative; decr() asserts before decrementing.
+        post_incr_refcount = self._refcounts[index] + 1
+        self._refcounts[index] = post_incr_refcount
         return post_incr_refcount
 
     def decr(self, block_id: BlockId) -> RefCount:
-        assert block_id in self._refcounts
-        refcount = self._refcounts[block_id]
+        index = block_id - self._offset
+        assert 0 <= index < len(self._refcounts)
+        refcount = self._refcounts[index]
 
         assert refcount > 0
         refcount -= 1
 
-        self._refcounts[block_id] = refcount
+        self._refcounts[index] = refcount
 
         return refcount
 
     def get(self, block_id: BlockId) -> RefCount:
-        assert block_id in self._refcounts
-        return self._refcounts[block_id]
+        index = block_id - self._offset
+        assert 0 <= index < len(self._refcounts)
+        return self._refcounts[index]
 
     def as_readonly(self) -> "ReadOnlyRefCounter":
         return ReadOnlyRefCounter(self)
@@ -99,7 +102,7 @@ class CopyOnWriteTracker:
         refcounter: RefCounter,
         allocator: BlockAllocator,
     ):
-        self._copy_on_writes = defaultdict(list)
+        self._copy_on_writes: Dict[BlockId, List[BlockId]] = {}
         self._refcounter = refcounter
         self._allocator = allocator
 
@@ -138,7 +141,7 @@ class CopyOnWriteTracker:
                 prev_block=block.prev_block).block_id
 
             # Track src/dst copy.
-            self._copy_on_writes[src_block_id].append(block_id)
+            self._copy_on_writes.setdefault(src_block_id, []).append(block_id)
 
         return block_id
 
@@ -155,17 +158,19 @@ class CopyOnWriteTracker:
                 block indices to lists of destination block indices for the
                 current copy-on-write operations.
         """
-        cows = dict(self._copy_on_writes)
-        self._copy_on_writes.clear()
+        # Hand the tracked mapping over to the caller rather than copying it.
+        cows = self._copy_on_writes
+        self._copy_on_writes = {}
         return cows
 
 
 def get_all_blocks_recursively(last_block: Block) -> List[Block]:
     """Retrieves all the blocks in a sequence starting from the last block.
 
-    This function recursively traverses the sequence of blocks in reverse order,
-    starting from the given last block, and returns a list of all the blocks in
-    the sequence.
+    This function traverses the sequence of blocks in reverse order, starting
+    from the given last block, and returns a list of all the blocks in the
+    sequence. The traversal is iterative, so long sequences do not hit the
+    interpreter's recursion limit.
 
     Args:
         last_block (Block): The last block in the sequence.
@@ -174,12 +179,10 @@ def get_all_blocks_recursively(last_block: Block) -> List[Block]:
         List[Block]: A list of all the blocks in the sequence, in the order they
             appear.
     """
-
-    def recurse(block: Block, lst: List[Block]) -> None:
-        if block.prev_block is not None:
-            recurse(block.prev_block, lst)
-        lst.append(block)
-
     all_blocks = []
-    recurse(last_block, all_blocks)
+    block: Optional[Block] = last_block
+    while block is not None:
+        all_blocks.append(block)
+        block = block.prev_block
+    all_blocks.reverse()
     return all_blocks
@@ -124,6 +124,33 @@ class CpuGpuBlockAllocator(DeviceAwareBlockAllocator):
         """
         return self._allocators[device].allocate_mutable(prev_block)
 
+    def allocate_mutable_batch(self, prev_block: Optional[Block], count: int,
+                               device: Device) -> List[Block]:
+        """Allocates `count` new mutable blocks on the specified device, each
+        linked to the one allocated before it.
+
+        Args:
+            prev_block (Optional[Block]): The block preceding the first newly
+                allocated block in the sequence.
+            count (int): The number of blocks to allocate.
+            device (Device): The device on which to allocate the new blocks.
+
+        Returns:
+            List[Block]: The newly allocated mutable blocks, in sequence order.
+        """
+        allocate_mutable = self._allocators[device].allocate_mutable
+        blocks: List[Block] = []
+        try:
+            for _ in range(count):
+                prev_block = allocate_mutable(prev_block)
+                blocks.append(prev_block)
+        except BlockAllocator.NoFreeBlocksError:
+            # Give back the blocks allocated before running out, since the
+            # caller never sees them.
+            self.free_many(blocks)
+            raise
+        return blocks
+
     def allocate_immutable(self, prev_block: Optional[Block],
                            token_ids: List[int], device: Device) -> Block:
         """Allocates a new immutable block with the provided token IDs on the
@@ -143,6 +170,26 @@ class CpuGpuBlockAllocator(DeviceAwareBlockAllocator):
         return self._allocators[device].allocate_immutable(
             prev_block, token_ids)
 
+    def allocate_immutable_batch(self, prev_block: Optional[Block],
+                                 block_token_ids: List[List[int]],
+                                 device: Device) -> List[Block]:
+        """Allocates a chain of new immutable blocks on the specified device,
+        one per entry of block_token_ids.
+
+        Args:
+            prev_block (Optional[Block]): The block preceding the first newly
+                allocated block in the sequence. Used for prefix hashing.
+            block_token_ids (List[List[int]]): The token IDs to be stored in
+                each of the new blocks.
+            device (Device): The device on which to allocate the new blocks.
+
+        Returns:
+            List[Block]: The newly allocated immutable blocks, in sequence
+                order.
+        """
+        return self._allocators[device].allocate_immutable_batch(
+            prev_block, block_token_ids)
+
     def free(self, block: Block) -> None:
         """Frees the memory occupied by the given block.
 
@@ -152,6 +199,16 @@ class CpuGpuBlockAllocator(DeviceAwareBlockAllocator):
         allocator = self._block_ids_to_allocator[block.block_id]
         return allocator.free(block)
 
+    def free_many(self, blocks: List[Block]) -> None:
+        """Frees the memory occupied by each of the given blocks.
+
+        Args:
+            blocks (List[Block]): The blocks to be freed.
+        """
+        block_ids_to_allocator = self._block_ids_to_allocator
+        for block in blocks:
+            block_ids_to_allocator[block.block_id].free(block)
+
     def fork(self, last_block: Block) -> List[Block]:
         """Creates a new sequence of blocks that shares the same underlying
             memory as the original sequence.
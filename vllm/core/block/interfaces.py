@@ -6,6 +6,8 @@ from vllm.utils import Device
 
 class Block(ABC):
 
+    __slots__ = ()
+
     @abstractmethod
     def append_token_ids(self, token_ids: List[int]) -> None:
         pass
@@ -61,6 +63,12 @@ class BlockAllocator(ABC):
                            token_ids: List[int], device: Device) -> Block:
         pass
 
+    @abstractmethod
+    def allocate_immutable_batch(self, prev_block: Optional[Block],
+                                 block_token_ids: List[List[int]],
+                                 device: Device) -> List[Block]:
+        pass
+
     @abstractmethod
     def free(self, block: Block) -> None:
         pass
@@ -102,11 +110,26 @@ class DeviceAwareBlockAllocator(BlockAllocator):
                          device: Device) -> Block:
         pass
 
+    @abstractmethod
+    def allocate_mutable_batch(self, prev_block: Optional[Block], count: int,
+                               device: Device) -> List[Block]:
+        pass
+
+    @abstractmethod
+    def free_many(self, blocks: List[Block]) -> None:
+        pass
+
     @abstractmethod
     def allocate_immutable(self, prev_block: Optional[Block],
                            token_ids: List[int], device: Device) -> Block:
         pass
 
+    @abstractmethod
+    def allocate_immutable_batch(self, prev_block: Optional[Block],
+                                 block_token_ids: List[List[int]],
+                                 device: Device) -> List[Block]:
+        pass
+
     @abstractmethod
     def get_num_free_blocks(self, device: Device) -> int:
         pass
@@ -1,4 +1,4 @@
-from typing import Dict, Iterable, List, Optional, Set
+from typing import Dict, Iterable, List, Optional
 
 from vllm.core.block.common import (CopyOnWriteTracker, RefCounter,
                                     get_all_blocks_recursively)
@@ -35,12 +35,15 @@ class NaiveBlockAllocator(BlockAllocator):
         if block_ids is None:
             block_ids = range(num_blocks)
 
-        self._free_block_indices: Set[BlockId] = set(block_ids)
-        self._all_block_indices = frozenset(block_ids)
+        # Free block ids are kept in a list used as a stack. It is sorted in
+        # descending order so that the lowest ids are handed out first.
+        self._free_block_indices: List[BlockId] = sorted(block_ids,
+                                                         reverse=True)
+        self._all_block_indices = frozenset(self._free_block_indices)
         assert len(self._all_block_indices) == num_blocks
 
         self._refcounter = RefCounter(
-            all_block_indices=self._free_block_indices)
+            all_block_indices=self._all_block_indices)
         self._create_block = create_block
         self._block_size = block_size
 
@@ -63,9 +66,57 @@ class NaiveBlockAllocator(BlockAllocator):
         Returns:
             Block: The newly allocated immutable block.
         """
-        block = self.allocate_mutable(prev_block=prev_block)
-        block.append_token_ids(token_ids)
-        return block
+        block_id = self._allocate_new_block_id()
+        return self._create_block(
+            prev_block=prev_block,
+            token_ids=token_ids,
+            block_id=block_id,
+            block_size=self._block_size,
+            allocator=self,
+        )
+
+    def allocate_immutable_batch(
+            self, prev_block: Optional[Block],
+            block_token_ids: List[List[int]]) -> List[Block]:
+        """Allocates a chain of new immutable blocks, one per entry of
+        block_token_ids, linked to the previous block.
+
+        The block ids for the whole chain are taken from the free list at once,
+        so either all blocks are allocated or none are.
+
+        Args:
+            prev_block (Optional[Block]): The block preceding the first newly
+                allocated block in the sequence.
+            block_token_ids (List[List[int]]): The token IDs to be stored in
+                each of the new blocks.
+
+        Returns:
+            List[Block]: The newly allocated immutable blocks, in sequence
+                order.
+        """
+        num_blocks = len(block_token_ids)
+        if num_blocks == 0:
+            return []
+        if num_blocks > len(self._free_block_indices):
+            raise BlockAllocator.NoFreeBlocksError()
+
+        # Pop from the top of the stack so the lowest ids come first, as with
+        # repeated single allocations.
+        block_ids = self._free_block_indices[:-num_blocks - 1:-1]
+        del self._free_block_indices[-num_blocks:]
+
+        blocks = []
+        for block_id, token_ids in zip(block_ids, block_token_ids):
+            self._refcounter.incr(block_id)
+            prev_block = self._create_block(
+                prev_block=prev_block,
+                token_ids=token_ids,
+                block_id=block_id,
+                block_size=self._block_size,
+                allocator=self,
+            )
+            blocks.append(prev_block)
+        return blocks
 
     def allocate_mutable(self, prev_block: Optional[Block]) -> Block:
         """Allocates a new mutable block, linked to the previous block.
@@ -106,23 +157,27 @@ class NaiveBlockAllocator(BlockAllocator):
         """
         source_blocks = get_all_blocks_recursively(last_block)
 
+        incr = self._refcounter.incr
+        create_block = self._create_block
+        block_size = self._block_size
+
         forked_blocks = []
         prev_block = None
         for block in source_blocks:
+            block_id = block.block_id
 
             # Increment refcount for each block.
-            refcount = self._refcounter.incr(block.block_id)
+            refcount = incr(block_id)
             assert refcount != 1, "can't fork free'd block"
 
-            forked_blocks.append(
-                self._create_block(
-                    prev_block=prev_block,
-                    token_ids=block.token_ids,
-                    block_id=block.block_id,
-                    block_size=self._block_size,
-                    allocator=self,
-                ))
-            prev_block = forked_blocks[-1]
+            prev_block = create_block(
+                prev_block=prev_block,
+                token_ids=block.token_ids,
+                block_id=block_id,
+                block_size=block_size,
+                allocator=self,
+            )
+            forked_blocks.append(prev_block)
 
         return forked_blocks
 
@@ -133,15 +188,14 @@ class NaiveBlockAllocator(BlockAllocator):
         if not self._free_block_indices:
             raise BlockAllocator.NoFreeBlocksError()
 
-        block_id = next(iter(self._free_block_indices))
+        block_id = self._free_block_indices.pop()
         self._refcounter.incr(block_id)
-        self._free_block_indices.remove(block_id)
         return block_id
 
     def _free_block_id(self, block_id: BlockId) -> None:
         refcount = self._refcounter.decr(block_id)
         if refcount == 0:
-            self._free_block_indices.add(block_id)
+            self._free_block_indices.append(block_id)
 
     @property
     def refcounter(self):
@@ -214,6 +268,9 @@ class NaiveBlock(Block):
             If not provided, it defaults to self.
     """
 
+    __slots__ = ("_token_ids", "_block_size", "_prev_block", "_block_id",
+                 "_allocator", "_cow_target")
+
     def __init__(self,
                  prev_block: Block,
                  token_ids: List[int],
@@ -221,15 +278,14 @@ class NaiveBlock(Block):
                  allocator: BlockAllocator,
                  block_id: Optional[int] = None,
                  _cow_target: Optional[Block] = None):
-        self._token_ids = []
+        assert len(token_ids) <= block_size
+        self._token_ids = list(token_ids)
         self._block_size = block_size
         self._prev_block = prev_block
         self._block_id = block_id
         self._allocator = allocator
         self._cow_target = _cow_target if _cow_target is not None else self
 
-        self._append_token_ids_no_cow(token_ids)
-
     def append_token_ids(self, token_ids: List[int]) -> None:
         """Appends the given token IDs to the block, instructing the allocator
         to perform a copy-on-write if necessary.
@@ -120,6 +120,31 @@ class PrefixCachingBlockAllocator(BlockAllocator):
 
         return block
 
+    def allocate_immutable_batch(
+            self, prev_block: Optional[Block],
+            block_token_ids: List[List[int]]) -> List[Block]:
+        """Allocates a chain of immutable blocks, one per entry of
+        block_token_ids, reusing cached blocks if possible.
+
+        Each block may hit the cache independently, so the blocks are
+        allocated one at a time.
+
+        Args:
+            prev_block (Optional[Block]): The block preceding the first newly
+                allocated block in the sequence.
+            block_token_ids (List[List[int]]): The token IDs to be stored in
+                each of the blocks.
+
+        Returns:
+            List[Block]: The allocated immutable blocks, in sequence order.
+        """
+        blocks = []
+        for token_ids in block_token_ids:
+            prev_block = self.allocate_immutable(prev_block=prev_block,
+                                                 token_ids=token_ids)
+            blocks.append(prev_block)
+        return blocks
+
     def allocate_mutable(self, prev_block: Block) -> Block:
         """Allocates a mutable block. If there are no free blocks, this will
         evict unused cached blocks.
@@ -312,10 +337,15 @@ class PrefixCachingBlockAllocator(BlockAllocator):
         # prompt is cached. This would cause erroneous behavior in model
         # runner.
         ids_list = [
-            takewhile(lambda block_id: computed(block_id), seq[:-1])
+            list(takewhile(lambda block_id: computed(block_id), seq[:-1]))
             for seq in seq_block_ids
         ]
-        return commonprefix([ids for ids in ids_list if ids != []])
+        ids_list = [ids for ids in ids_list if ids]
+        if len(ids_list) <= 1:
+            # Fast path for the common single-sequence prefill. This also
+            # avoids commonprefix([]), which returns '' instead of a list.
+            return ids_list[0] if ids_list else []
+        return commonprefix(ids_list)
 
 
 class PrefixCachingBlock(Block):
@@ -338,6 +368,9 @@ class PrefixCachingBlock(Block):
             of this block. Defaults to None.
     """
 
+    __slots__ = ("_prev_block", "_cached_content_hash",
+                 "_prefix_caching_allocator", "_block")
+
     def __init__(
         self,
         prev_block: Optional["PrefixCachingBlock"],
@@ -1,12 +1,13 @@
 """A block manager that manages token blocks."""
 from abc import ABC, abstractmethod
-from itertools import count, takewhile
+from itertools import count
 from os.path import commonprefix
 from typing import Dict, List, Optional
 from typing import Sequence as GenericSequence
 from typing import Set
 
-from vllm.block import BlockTable, PhysicalTokenBlock
+from vllm.block import (DEFAULT_LAST_ACCESSED_TIME, BlockTable,
+                        PhysicalTokenBlock)
 from vllm.core.evictor import EvictionPolicy, Evictor, make_evictor
 from vllm.core.interfaces import AllocStatus, BlockSpaceManager
 from vllm.logger import init_logger
@@ -107,10 +108,10 @@ class CachedBlockAllocator(BlockAllocatorBase):
             block.ref_count += 1
             assert block.block_hash == block_hash
             return block
-        if block_hash not in self.cached_blocks:
-            self.cached_blocks[block_hash] = self.allocate_block(
-                block_hash, num_hashed_tokens)
-        block = self.cached_blocks[block_hash]
+        block = self.cached_blocks.get(block_hash)
+        if block is None:
+            block = self.allocate_block(block_hash, num_hashed_tokens)
+            self.cached_blocks[block_hash] = block
         assert block.block_hash == block_hash
         block.ref_count += 1
         return block
@@ -244,6 +245,10 @@ class BlockSpaceManagerV1(BlockSpaceManager):
                 Device.CPU, block_size, num_cpu_blocks)
         # Mapping: seq_id -> BlockTable.
         self.block_tables: Dict[int, BlockTable] = {}
+        # The most recent scheduling time passed to access_all_blocks_in_seq.
+        # Only freed blocks are candidates for eviction, so blocks are stamped
+        # with this time when they are freed rather than on every step.
+        self._last_access_time = DEFAULT_LAST_ACCESSED_TIME
 
     def can_allocate(self, seq_group: SequenceGroup) -> AllocStatus:
         # FIXME(woosuk): Here we assume that all sequences in the group share
@@ -268,31 +273,38 @@ class BlockSpaceManagerV1(BlockSpaceManager):
     def allocate(self, seq_group: SequenceGroup) -> None:
         # NOTE: Here we assume that all sequences in the group have the same
         # prompt.
-        seq = seq_group.get_seqs(status=SequenceStatus.WAITING)[0]
+        waiting_seqs = seq_group.get_seqs(status=SequenceStatus.WAITING)
+        seq = waiting_seqs[0]
 
         # Allocate new physical token blocks that will store the prompt tokens.
         num_prompt_blocks = len(seq.logical_token_blocks)
+        num_seqs = seq_group.num_seqs()
 
+        block_sliding_window = self.block_sliding_window
+        enable_caching = self.enable_caching
+        allocate = self.gpu_allocator.allocate
         block_table: BlockTable = []
         for logical_idx in range(num_prompt_blocks):
-            if (self.block_sliding_window is not None
-                    and logical_idx >= self.block_sliding_window):
-                block = block_table[logical_idx % self.block_sliding_window]
+            if (block_sliding_window is not None
+                    and logical_idx >= block_sliding_window):
+                block = block_table[logical_idx % block_sliding_window]
                 # Set the reference counts of the token blocks.
-                block.ref_count = seq_group.num_seqs()
-            elif self.enable_caching:
-                block = self.gpu_allocator.allocate(
-                    seq.hash_of_block(logical_idx),
-                    seq.num_hashed_tokens_of_block(logical_idx))
+                block.ref_count = num_seqs
+            elif enable_caching:
+                block = allocate(seq.hash_of_block(logical_idx),
+                                 seq.num_hashed_tokens_of_block(logical_idx))
             else:
-                block = self.gpu_allocator.allocate()
+                block = allocate()
                 # Set the reference counts of the token blocks.
-                block.ref_count = seq_group.num_seqs()
+                block.ref_count = num_seqs
             block_table.append(block)
 
-        # Assign the block table for each sequence.
-        for seq in seq_group.get_seqs(status=SequenceStatus.WAITING):
+        # Assign the block table for each sequence. The tables diverge once
+        # the sequences start appending slots, so each needs its own list;
+        # the last sequence can take the one built above.
+        for seq in waiting_seqs[:-1]:
             self.block_tables[seq.seq_id] = block_table.copy()
+        self.block_tables[waiting_seqs[-1].seq_id] = block_table
 
     def can_append_slots(self,
                          seq_group: SequenceGroup,
@@ -426,18 +438,25 @@ class BlockSpaceManagerV1(BlockSpaceManager):
         # In this case the block tables will contain repeated blocks.
         # When forking, we must make sure that each block's `ref_count`
         # is only incremented by one, so we deduplicate them by wrapping
-        # them in a set.
-        for block in set(src_block_table):
+        # them in a set. Without a sliding window the blocks are unique.
+        blocks = (set(src_block_table)
+                  if self.block_sliding_window is not None else
+                  src_block_table)
+        for block in blocks:
             block.ref_count += 1
 
     def _get_physical_blocks(
             self, seq_group: SequenceGroup) -> List[PhysicalTokenBlock]:
         # NOTE: Here, we assume that the physical blocks are only shared by
         # the sequences in the same group.
+        unfinished_seqs = seq_group.get_unfinished_seqs()
+        if len(unfinished_seqs) == 1 and self.block_sliding_window is None:
+            # Without a sliding window a single block table never repeats a
+            # block, so there is nothing to deduplicate.
+            return list(self.block_tables[unfinished_seqs[0].seq_id])
+
         blocks: Set[PhysicalTokenBlock] = set()
-        for seq in seq_group.get_seqs():
-            if seq.is_finished():
-                continue
+        for seq in unfinished_seqs:
             blocks.update(self.block_tables[seq.seq_id])
         return list(blocks)
 
@@ -464,27 +483,14 @@ class BlockSpaceManagerV1(BlockSpaceManager):
         # CPU block -> GPU block.
         mapping: Dict[PhysicalTokenBlock, PhysicalTokenBlock] = {}
         for seq in seq_group.get_seqs(status=SequenceStatus.SWAPPED):
-            new_block_table: BlockTable = []
-            block_table = self.block_tables[seq.seq_id]
-
-            for cpu_block in block_table:
-                if cpu_block in mapping:
-                    gpu_block = mapping[cpu_block]
-                    gpu_block.ref_count += 1
-                else:
-                    gpu_block = self.gpu_allocator.allocate(
-                        cpu_block.block_hash, cpu_block.num_hashed_tokens)
-                    mapping[cpu_block] = gpu_block
-                new_block_table.append(gpu_block)
-                # Free the CPU block swapped in to GPU.
-                self.cpu_allocator.free(cpu_block)
-            self.block_tables[seq.seq_id] = new_block_table
-
-        block_number_mapping = {
+            self.block_tables[seq.seq_id] = self._swap_block_table(
+                self.block_tables[seq.seq_id], self.cpu_allocator,
+                self.gpu_allocator, mapping)
+
+        return {
             cpu_block.block_number: gpu_block.block_number
             for cpu_block, gpu_block in mapping.items()
         }
-        return block_number_mapping
 
     def can_swap_out(self, seq_group: SequenceGroup) -> bool:
         blocks = self._get_physical_blocks(seq_group)
@@ -494,50 +500,71 @@ class BlockSpaceManagerV1(BlockSpaceManager):
         # GPU block -> CPU block.
         mapping: Dict[PhysicalTokenBlock, PhysicalTokenBlock] = {}
         for seq in seq_group.get_seqs(status=SequenceStatus.RUNNING):
-            new_block_table: BlockTable = []
-            block_table = self.block_tables[seq.seq_id]
-
-            for gpu_block in block_table:
-                if gpu_block in mapping:
-                    cpu_block = mapping[gpu_block]
-                    cpu_block.ref_count += 1
-                else:
-                    cpu_block = self.cpu_allocator.allocate(
-                        gpu_block.block_hash, gpu_block.num_hashed_tokens)
-                    mapping[gpu_block] = cpu_block
-                new_block_table.append(cpu_block)
-                # Free the GPU block swapped out to CPU.
-                self.gpu_allocator.free(gpu_block)
-            self.block_tables[seq.seq_id] = new_block_table
-
-        block_number_mapping = {
+            self.block_tables[seq.seq_id] = self._swap_block_table(
+                self.block_tables[seq.seq_id], self.gpu_allocator,
+                self.cpu_allocator, mapping)
+
+        return {
             gpu_block.block_number: cpu_block.block_number
             for gpu_block, cpu_block in mapping.items()
         }
-        return block_number_mapping
+
+    def _swap_block_table(
+        self,
+        block_table: BlockTable,
+        src_allocator: BlockAllocatorBase,
+        dest_allocator: BlockAllocatorBase,
+        mapping: Dict[PhysicalTokenBlock, PhysicalTokenBlock],
+    ) -> BlockTable:
+        """Moves a block table to the destination allocator.
+
+        Source blocks already in `mapping` were moved for another sequence in
+        the group; their destination block is shared instead of allocated.
+        """
+        src_free = src_allocator.free
+        dest_allocate = dest_allocator.allocate
+        new_block_table: BlockTable = []
+        if self.enable_caching:
+            self._touch_blocks(block_table)
+        for from_block in block_table:
+            to_block = mapping.get(from_block)
+            if to_block is not None:
+                to_block.ref_count += 1
+            else:
+                to_block = dest_allocate(from_block.block_hash,
+                                         from_block.num_hashed_tokens)
+                mapping[from_block] = to_block
+            new_block_table.append(to_block)
+            # Free the source block that was moved.
+            src_free(from_block)
+        return new_block_table
 
     def _free_block_table(self, block_table: BlockTable) -> None:
         # when using a sliding window, each seq will only use up
         # to `self.block_sliding_window` blocks. When freeing
         # the block table, we must make sure to not free blocks more
-        # than once. If no sliding window is used, there is no block
-        # reuse in the block table, so we must free all blocks.
+        # than once. Logical block i reuses the physical block of
+        # i % block_sliding_window, so the last `block_sliding_window`
+        # entries hold each physical block exactly once. If no sliding
+        # window is used, there is no block reuse in the block table, so
+        # we must free all blocks. Either way no deduplication is needed.
         blocks_to_free = (block_table[-self.block_sliding_window:]
                           if self.block_sliding_window is not None else
                           block_table)
-        for block in set(blocks_to_free):
+        if self.enable_caching:
+            self._touch_blocks(blocks_to_free)
+        for block in blocks_to_free:
             if block.device == Device.GPU:
                 self.gpu_allocator.free(block)
             else:
                 self.cpu_allocator.free(block)
 
     def free(self, seq: Sequence) -> None:
-        if seq.seq_id not in self.block_tables:
+        block_table = self.block_tables.pop(seq.seq_id, None)
+        if block_table is None:
             # Already freed or haven't been scheduled yet.
             return
-        block_table = self.block_tables[seq.seq_id]
         self._free_block_table(block_table)
-        del self.block_tables[seq.seq_id]
 
     def reset(self) -> None:
         for block_table in self.block_tables.values():
@@ -559,18 +586,25 @@ class BlockSpaceManagerV1(BlockSpaceManager):
         seq: Sequence,
         access_time: float,
     ) -> None:
-        if self.enable_caching:
-            # Update the last accessed time of all the blocks accessed
-            # in this step.
-            block_table = self.block_tables[seq.seq_id]
-            for block in block_table:
-                block.last_accessed = access_time
+        # The blocks of a running sequence are all accessed in every step, so
+        # only the time is recorded here. It is written to the blocks when
+        # they are freed and become eviction candidates (see _touch_blocks).
+        self._last_access_time = access_time
+
+    def _touch_blocks(self, blocks: BlockTable) -> None:
+        # Stamp blocks that are about to be freed with the last time they
+        # were accessed, for LRU eviction. This must happen before the blocks
+        # are freed: the evictor keys its heap on last_accessed when a block
+        # is added, so a later write would leave the entry unmatchable.
+        access_time = self._last_access_time
+        for block in blocks:
+            block.last_accessed = access_time
 
     def compute_full_blocks_in_seq(self, seq: Sequence):
-        if seq.seq_id not in self.block_tables:
+        block_table = self.block_tables.get(seq.seq_id)
+        if block_table is None:
             return
         max_full_block = seq.get_len() // self.block_size - 1
-        block_table = self.block_tables[seq.seq_id]
         if max_full_block == -1:
             return
         for i in reversed(range(max_full_block)):
@@ -579,16 +613,18 @@ class BlockSpaceManagerV1(BlockSpaceManager):
             block_table[i].computed = True
 
     def get_all_computed_blocks(self, seq: Sequence) -> List[int]:
-        if seq.seq_id not in self.block_tables:
+        block_table = self.block_tables.get(seq.seq_id)
+        if block_table is None:
             return []
-        block_table = self.block_tables[seq.seq_id]
         # NOTE We exclude the last block to avoid the case where the entire
         # prompt is cached. This would cause erroneous behavior in model
         # runner.
-        return [
-            b.block_number
-            for b in takewhile(lambda b: b.computed, block_table[:-1])
-        ]
+        computed_block_ids: List[int] = []
+        for block in block_table[:-1]:
+            if not block.computed:
+                break
+            computed_block_ids.append(block.block_number)
+        return computed_block_ids
 
     def get_common_computed_block_ids(
             self, seqs: List[Sequence]) -> GenericSequence[int]:
@@ -601,7 +637,12 @@ class BlockSpaceManagerV1(BlockSpaceManager):
             return []
 
         ids_list = [self.get_all_computed_blocks(seq) for seq in seqs]
-        return commonprefix([ids for ids in ids_list if ids != []])
+        ids_list = [ids for ids in ids_list if ids]
+        if len(ids_list) <= 1:
+            # Fast path for the common single-sequence prefill. This also
+            # avoids commonprefix([]), which returns '' instead of a list.
+            return ids_list[0] if ids_list else []
+        return commonprefix(ids_list)
 
     def mark_blocks_as_computed(self, seq_group: SequenceGroup):
         if self.enable_caching:
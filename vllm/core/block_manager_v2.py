@@ -93,7 +93,7 @@ class BlockSpaceManagerV2(BlockSpaceManager):
         seq = seq_group.get_seqs(status=SequenceStatus.WAITING)[0]
 
         num_required_blocks = BlockTable.get_num_required_blocks(
-            seq.get_token_ids(),
+            seq.get_len(),
             block_size=self.block_size,
         )
 
@@ -155,8 +155,8 @@ class BlockSpaceManagerV2(BlockSpaceManager):
 
             num_touched_blocks += (
                 block_table.get_num_blocks_touched_by_append_slots(
-                    token_ids=block_table.get_unseen_token_ids(
-                        seq.get_token_ids()),
+                    token_ids=seq.get_token_ids_from(
+                        block_table.num_full_slots),
                     num_lookahead_slots=num_lookahead_slots,
                 ))
 
@@ -173,7 +173,7 @@ class BlockSpaceManagerV2(BlockSpaceManager):
         block_table = self.block_tables[seq.seq_id]
 
         block_table.append_token_ids(
-            token_ids=block_table.get_unseen_token_ids(seq.get_token_ids()),
+            token_ids=seq.get_token_ids_from(block_table.num_full_slots),
             num_lookahead_slots=num_lookahead_slots,
         )
 
@@ -182,11 +182,11 @@ class BlockSpaceManagerV2(BlockSpaceManager):
         return new_cows
 
     def free(self, seq: Sequence) -> None:
-        if seq.seq_id not in self.block_tables:
+        block_table = self.block_tables.pop(seq.seq_id, None)
+        if block_table is None:
             # Already freed or haven't been scheduled yet.
             return
-        self.block_tables[seq.seq_id].free()
-        del self.block_tables[seq.seq_id]
+        block_table.free()
 
     def get_block_table(self, seq: Sequence) -> List[int]:
         assert seq.seq_id in self.block_tables
@@ -1,6 +1,7 @@
 import enum
+import heapq
 from abc import ABC, abstractmethod, abstractproperty
-from typing import OrderedDict
+from typing import Dict, List, Tuple
 
 from vllm.block import PhysicalTokenBlock
 
@@ -55,10 +56,19 @@ class LRUEvictor(Evictor):
     the same last_accessed time, then the one with the largest num_hashed_tokens
     will be evicted. If two blocks each have the lowest last_accessed time and
     highest num_hashed_tokens value, then one will be chose arbitrarily
+
+    The candidates are kept in a min-heap keyed on
+    (last_accessed, -num_hashed_tokens). Removed blocks are not deleted from
+    the heap; their entries are skipped when they reach the top.
     """
 
+    # Rebuild the heap once stale entries outnumber the live ones by this
+    # factor.
+    _HEAP_COMPACTION_FACTOR = 2
+
     def __init__(self):
-        self.free_table: OrderedDict[int, PhysicalTokenBlock] = OrderedDict()
+        self.free_table: Dict[int, PhysicalTokenBlock] = {}
+        self._heap: List[Tuple[float, int, int]] = []
 
     def __contains__(self, block_hash: int) -> bool:
         return block_hash in self.free_table
@@ -67,32 +77,43 @@ class LRUEvictor(Evictor):
         if len(self.free_table) == 0:
             raise ValueError("No usable cache memory left")
 
-        evicted_block = next(iter(self.free_table.values()))
-        # The blocks with the lowest timestamps should be placed consecutively
-        # at the start of OrderedDict. Loop through all these blocks to
-        # find the one with maximum number of hashed tokens.
-        for _, block in self.free_table.items():
-            if evicted_block.last_accessed < block.last_accessed:
+        while True:
+            last_accessed, neg_num_hashed_tokens, block_hash = heapq.heappop(
+                self._heap)
+            block = self.free_table.get(block_hash)
+            # Skip entries of blocks that were removed, and of blocks that
+            # were removed and added back with a different key.
+            if (block is not None and block.last_accessed == last_accessed
+                    and block.num_hashed_tokens == -neg_num_hashed_tokens):
                 break
-            if evicted_block.num_hashed_tokens < block.num_hashed_tokens:
-                evicted_block = block
 
-        self.free_table.pop(evicted_block.block_hash)
+        del self.free_table[block_hash]
 
-        evicted_block.computed = False
-        return evicted_block
+        block.computed = False
+        return block
 
     def add(self, block: PhysicalTokenBlock):
         self.free_table[block.block_hash] = block
+        heapq.heappush(
+            self._heap,
+            (block.last_accessed, -block.num_hashed_tokens, block.block_hash))
 
     def remove(self, block_hash: int) -> PhysicalTokenBlock:
-        if block_hash not in self.free_table:
+        block = self.free_table.pop(block_hash, None)
+        if block is None:
             raise ValueError(
                 "Attempting to remove block that's not in the evictor")
-        block: PhysicalTokenBlock = self.free_table[block_hash]
-        self.free_table.pop(block_hash)
+        if (len(self._heap) >
+                self._HEAP_COMPACTION_FACTOR * len(self.free_table) + 1):
+            self._compact_heap()
         return block
 
+    def _compact_heap(self) -> None:
+        self._heap = [(block.last_accessed, -block.num_hashed_tokens,
+                       block_hash)
+                      for block_hash, block in self.free_table.items()]
+        heapq.heapify(self._heap)
+
     @property
     def num_blocks(self) -> int:
         return len(self.free_table)
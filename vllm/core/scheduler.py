@@ -327,9 +327,18 @@ class Scheduler:
                     # Appending aborted group into pending list.
                     aborted_groups.append(seq_group)
                     request_ids.remove(seq_group.request_id)
+            if not aborted_groups:
+                continue
+            # Remove the aborted groups from the state queue in one pass,
+            # rather than one deque.remove() scan per group.
+            aborted_ids = set(map(id, aborted_groups))
+            remaining_groups = [
+                seq_group for seq_group in state_queue
+                if id(seq_group) not in aborted_ids
+            ]
+            state_queue.clear()
+            state_queue.extend(remaining_groups)
             for aborted_group in aborted_groups:
-                # Remove the sequence group from the state queue.
-                state_queue.remove(aborted_group)
                 for seq in aborted_group.get_seqs():
                     if seq.is_finished():
                         continue
@@ -594,10 +603,14 @@ class Scheduler:
         seq_groups: List[SequenceGroup] = []
         # We don't sort waiting queue because we assume it is sorted.
         # Copy the queue so that the input queue is not modified.
-        waiting_queue = deque([s for s in waiting_queue])
+        waiting_queue = deque(waiting_queue)
 
         leftover_waiting_sequences: Deque[SequenceGroup] = deque()
-        while self._passed_delay(time.time()) and waiting_queue:
+        # The delay only depends on the time elapsed since the earliest
+        # arrival, so once it has passed it stays passed for this call.
+        passed_delay = self._passed_delay(time.time())
+        lora_enabled = self.lora_enabled
+        while passed_delay and waiting_queue:
             seq_group = waiting_queue[0]
 
             waiting_seqs = seq_group.get_seqs(status=SequenceStatus.WAITING)
@@ -636,12 +649,11 @@ class Scheduler:
                 continue
 
             lora_int_id = 0
-            if self.lora_enabled:
+            if lora_enabled:
                 lora_int_id = seq_group.lora_int_id
                 assert curr_loras is not None
                 assert self.lora_config is not None
-                if (self.lora_enabled and lora_int_id > 0
-                        and lora_int_id not in curr_loras
+                if (lora_int_id > 0 and lora_int_id not in curr_loras
                         and len(curr_loras) >= self.lora_config.max_loras):
                     # We don't have a space for another LoRA, so
                     # we ignore this request for now.
@@ -689,14 +701,14 @@ class Scheduler:
             token_budget=self.scheduler_config.max_num_batched_tokens,
             max_num_seqs=self.scheduler_config.max_num_seqs,
         )
+        curr_loras: Optional[Set[int]] = set() if self.lora_enabled else None
         # Make sure we include num running seqs before scheduling prefill,
         # so that we don't schedule beyond max_num_seqs for prefill.
         for seq_group in self.running:
             budget.add_num_seqs(seq_group.request_id,
                                 seq_group.get_max_num_running_seqs())
-        curr_loras = set(
-            seq_group.lora_int_id
-            for seq_group in self.running) if self.lora_enabled else None
+            if curr_loras is not None:
+                curr_loras.add(seq_group.lora_int_id)
 
         remaining_waiting, prefills = (self.waiting,
                                        SchedulerPrefillOutputs.create_empty())
@@ -899,15 +911,15 @@ class Scheduler:
             # seq_id -> physical block numbers
             block_tables: Dict[int, List[int]] = {}
 
-            for seq in seq_group.get_seqs(status=SequenceStatus.RUNNING):
+            running_seqs = seq_group.get_seqs(status=SequenceStatus.RUNNING)
+            for seq in running_seqs:
                 seq_id = seq.seq_id
                 seq_data[seq_id] = seq.data
                 block_tables[seq_id] = self.block_manager.get_block_table(seq)
                 self.block_manager.access_all_blocks_in_seq(seq, now)
 
             common_computed_block_nums = (
-                self.block_manager.get_common_computed_block_ids(
-                    seq_group.get_seqs(status=SequenceStatus.RUNNING)))
+                self.block_manager.get_common_computed_block_ids(running_seqs))
 
             # It assumes the scheduled_seq_groups is ordered by
             # prefill < decoding.
@@ -979,9 +991,7 @@ class Scheduler:
             cows = self.block_manager.append_slots(seq, num_lookahead_slots)
 
             for src, dests in cows.items():
-                if src not in blocks_to_copy:
-                    blocks_to_copy[src] = []
-                blocks_to_copy[src].extend(dests)
+                blocks_to_copy.setdefault(src, []).extend(dests)
 
     def _preempt(
         self,
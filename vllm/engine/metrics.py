@@ -2,7 +2,6 @@ import time
 from dataclasses import dataclass
 from typing import Dict, List, Protocol
 
-import numpy as np
 from prometheus_client import (REGISTRY, Counter, Gauge, Histogram, Info,
                                disable_created_metrics)
 
@@ -134,8 +133,8 @@ class StatLogger:
         self.local_interval = local_interval
 
         # Tracked stats over current local logging interval.
-        self.num_prompt_tokens: List[int] = []
-        self.num_generation_tokens: List[int] = []
+        self.num_prompt_tokens = 0
+        self.num_generation_tokens = 0
 
         # Prometheus metrics
         self.labels = labels
@@ -145,8 +144,8 @@ class StatLogger:
         if type == "cache_config":
             self.metrics.info_cache_config.info(obj.metrics_info())
 
-    def _get_throughput(self, tracked_stats: List[int], now: float) -> float:
-        return float(np.sum(tracked_stats) / (now - self.last_local_log))
+    def _get_throughput(self, num_tokens: int, now: float) -> float:
+        return num_tokens / (now - self.last_local_log)
 
     def _local_interval_elapsed(self, now: float) -> bool:
         elapsed_time = now - self.last_local_log
@@ -205,8 +204,8 @@ class StatLogger:
         self._log_prometheus(stats)
 
         # Save tracked stats for token counters.
-        self.num_prompt_tokens.append(stats.num_prompt_tokens)
-        self.num_generation_tokens.append(stats.num_generation_tokens)
+        self.num_prompt_tokens += stats.num_prompt_tokens
+        self.num_generation_tokens += stats.num_generation_tokens
 
         # Log locally every local_interval seconds.
         if self._local_interval_elapsed(stats.now):
@@ -232,6 +231,6 @@ class StatLogger:
                 f"CPU KV cache usage: {stats.cpu_cache_usage * 100:.1f}%")
 
             # Reset tracked stats for next interval.
-            self.num_prompt_tokens = []
-            self.num_generation_tokens = []
+            self.num_prompt_tokens = 0
+            self.num_generation_tokens = 0
             self.last_local_log = stats.now
@@ -1,3 +1,4 @@
+import heapq
 import time
 from typing import List, Optional, Union
 
@@ -24,6 +25,9 @@ class CompletionOutput:
         lora_request: The LoRA request that was used to generate the output.
     """
 
+    __slots__ = ("index", "text", "token_ids", "cumulative_logprob",
+                 "logprobs", "finish_reason", "stop_reason", "lora_request")
+
     def __init__(
         self,
         index: int,
@@ -71,6 +75,9 @@ class RequestOutput:
         lora_request: The LoRA request that was used to generate the output.
     """
 
+    __slots__ = ("request_id", "prompt", "prompt_token_ids", "prompt_logprobs",
+                 "outputs", "finished", "metrics", "lora_request")
+
     def __init__(
         self,
         request_id: str,
@@ -93,28 +100,32 @@ class RequestOutput:
 
     @classmethod
     def from_seq_group(cls, seq_group: SequenceGroup) -> "RequestOutput":
+        sampling_params = seq_group.sampling_params
         seqs = seq_group.get_seqs()
+        # Map each sequence to its position in the group. Keyed by id() so
+        # the lookup below does not need to compare Sequence objects.
+        seq_index = {id(seq): i for i, seq in enumerate(seqs)}
         if len(seqs) == 1:
             top_n_seqs = seqs
         else:
             # Get the top-n sequences.
-            n = seq_group.sampling_params.n
-            if seq_group.sampling_params.use_beam_search:
+            n = sampling_params.n
+            if sampling_params.use_beam_search:
+                length_penalty = sampling_params.length_penalty
                 sorting_key = lambda seq: seq.get_beam_search_score(
-                    seq_group.sampling_params.length_penalty)
+                    length_penalty)
             else:
                 sorting_key = lambda seq: seq.get_cumulative_logprob()
-            sorted_seqs = sorted(seqs, key=sorting_key, reverse=True)
-            top_n_seqs = sorted_seqs[:n]
+            top_n_seqs = heapq.nlargest(n, seqs, key=sorting_key)
 
         # Create the outputs.
         # NOTE: We need omit logprobs here explicitly because the sequence
         # always has the logprobs of the sampled tokens even if the
         # logprobs are not requested.
-        include_logprobs = seq_group.sampling_params.logprobs is not None
-        text_buffer_length = seq_group.sampling_params.output_text_buffer_length
+        include_logprobs = sampling_params.logprobs is not None
+        text_buffer_length = sampling_params.output_text_buffer_length
         outputs = [
-            CompletionOutput(seqs.index(seq),
+            CompletionOutput(seq_index[id(seq)],
                              seq.get_output_text_to_return(text_buffer_length),
                              seq.get_output_token_ids(),
                              seq.get_cumulative_logprob(),
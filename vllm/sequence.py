@@ -44,29 +44,24 @@ class SequenceStatus(enum.Enum):
 
     @staticmethod
     def is_finished(status: "SequenceStatus") -> bool:
-        return status in [
-            SequenceStatus.FINISHED_STOPPED,
-            SequenceStatus.FINISHED_LENGTH_CAPPED,
-            SequenceStatus.FINISHED_ABORTED,
-            SequenceStatus.FINISHED_IGNORED,
-        ]
+        # Every finished status has a finish reason.
+        return status in _FINISHED_REASONS
 
     @staticmethod
     def get_finished_reason(status: "SequenceStatus") -> Union[str, None]:
-        if status == SequenceStatus.FINISHED_STOPPED:
-            finish_reason = "stop"
-        elif status == SequenceStatus.FINISHED_LENGTH_CAPPED:
-            finish_reason = "length"
-        elif status == SequenceStatus.FINISHED_ABORTED:
-            finish_reason = "abort"
-        elif status == SequenceStatus.FINISHED_IGNORED:
-            # The ignored sequences are the sequences whose prompt lengths
-            # are longer than the model's length cap. Therefore, the stop
-            # reason should also be "length" as in OpenAI API.
-            finish_reason = "length"
-        else:
-            finish_reason = None
-        return finish_reason
+        return _FINISHED_REASONS.get(status)
+
+
+# Mapping: finished status -> finish reason reported in the outputs.
+_FINISHED_REASONS: Dict[SequenceStatus, str] = {
+    SequenceStatus.FINISHED_STOPPED: "stop",
+    SequenceStatus.FINISHED_LENGTH_CAPPED: "length",
+    SequenceStatus.FINISHED_ABORTED: "abort",
+    # The ignored sequences are the sequences whose prompt lengths
+    # are longer than the model's length cap. Therefore, the stop
+    # reason should also be "length" as in OpenAI API.
+    SequenceStatus.FINISHED_IGNORED: "length",
+}
 
 
 class SequenceStage(enum.Enum):
@@ -138,6 +133,14 @@ class SequenceData:
     def get_token_ids(self) -> List[int]:
         return self.prompt_token_ids + self.output_token_ids
 
+    def get_token_ids_from(self, start: int) -> List[int]:
+        """Return the token ids from position `start` on, without building
+        the full prompt + output list first."""
+        prompt_len = len(self.prompt_token_ids)
+        if start >= prompt_len:
+            return self.output_token_ids[start - prompt_len:]
+        return self.prompt_token_ids[start:] + self.output_token_ids
+
     def get_num_computed_tokens(self) -> int:
         """Return the number of prefill tokens that are already computed."""
         return self._num_computed_tokens
@@ -220,6 +223,10 @@ class Sequence:
         self.output_text = ""
 
         self.logical_token_blocks: List[LogicalTokenBlock] = []
+        # Hashes of full logical blocks, keyed by logical block index. The
+        # tokens of a full block and its prefix never change, so each hash is
+        # only computed once.
+        self._block_hashes: Dict[int, int] = {}
         # Initialize the logical token blocks with the prompt token ids.
         self._append_tokens_to_blocks(prompt_token_ids)
         self.status = SequenceStatus.WAITING
@@ -244,12 +251,21 @@ class Sequence:
     def hash_of_block(self, logical_idx: int) -> int:
         # TODO This can produce incorrect hash when block size > prompt size
 
+        block_hash = self._block_hashes.get(logical_idx)
+        if block_hash is not None:
+            return block_hash
+
         # Compute the number of tokens in the sequence
         # TODO: The current hashing function is O(L^2). We should optimize
         # this in the future.
         num_tokens = self.num_hashed_tokens_of_block(logical_idx)
-        return hash(
-            (tuple(self.data.get_token_ids()[0:num_tokens]), self.lora_int_id))
+        token_ids = self.data.get_token_ids()
+        block_hash = hash((tuple(token_ids[0:num_tokens]), self.lora_int_id))
+        # Only cache the hash once the block is full; the hash of a partial
+        # block changes as tokens are appended.
+        if num_tokens <= len(token_ids):
+            self._block_hashes[logical_idx] = block_hash
+        return block_hash
 
     def num_hashed_tokens_of_block(self, logical_idx: int):
         return logical_idx * self.block_size + self.block_size
@@ -303,6 +319,9 @@ class Sequence:
     def get_token_ids(self) -> List[int]:
         return self.data.get_token_ids()
 
+    def get_token_ids_from(self, start: int) -> List[int]:
+        return self.data.get_token_ids_from(start)
+
     def get_prompt_token_ids(self) -> List[int]:
         return self.data.get_prompt_token_ids()
 
@@ -511,6 +530,8 @@ class SequenceGroup:
         return num_uncomputed_tokens
 
     def num_seqs(self, status: Optional[SequenceStatus] = None) -> int:
+        if status is None:
+            return len(self.seqs_dict)
         return len(self.get_seqs(status))
 
     def num_unfinished_seqs(self) -> int:
@@ -535,7 +556,12 @@ class SequenceGroup:
         del self.seqs_dict[seq_id]
 
     def is_finished(self) -> bool:
-        return all(seq.is_finished() for seq in self.get_seqs())
+        # Return on the first unfinished sequence. While streaming, most
+        # groups are unfinished, so this usually stops at the first seq.
+        for seq in self.seqs_dict.values():
+            if not seq.is_finished():
+                return False
+        return True
 
     def is_prefill(self) -> bool:
         # Every sequences should be in the same stage.
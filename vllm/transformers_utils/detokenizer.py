@@ -171,10 +171,13 @@ def _convert_tokens_to_string_with_added_encoders(
     sub_texts: List[str] = []
     current_sub_text: List[str] = []
     all_special_tokens = set(tokenizer.all_special_tokens)
+    # get_added_vocab() builds a new dict on every call, so query it once
+    # instead of once per output token.
+    added_vocab = tokenizer.get_added_vocab()
     for token in output_tokens:
         if skip_special_tokens and token in all_special_tokens:
             continue
-        if token in tokenizer.get_added_vocab():
+        if token in added_vocab:
             if current_sub_text:
                 sub_text = tokenizer.convert_tokens_to_string(current_sub_text)
                 sub_texts.append(sub_text)